@@ -1,3 +1,8 @@
+import asyncio
+import importlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import discord
 from discord.ext import commands
 from loguru import logger
@@ -10,29 +15,78 @@ from src.config import (
     configure_ssl,
 )
 from src.utils.logger import setup_logger
-from src.utils.youtube_api import authenticate_youtube
+from src.utils.youtube_api import warmup as warmup_youtube
+
+# Command extensions loaded during setup_hook
+EXTENSIONS = (
+    "src.commands.voice_commands",
+    "src.commands.playback_commands",
+    "src.commands.queue_commands",
+    "src.commands.youtube_commands",
+)
+
+# Heavy modules imported in the background while the bot is being constructed
+PRELOAD_MODULES = ("src.player.ytdl_source",)
+
+
+def _preload() -> None:
+    """Configure SSL and import heavy modules off the main thread.
+
+    yt-dlp builds its extractor registry on import, which makes it the slowest
+    import in the process. Warming it here overlaps that cost with logger setup
+    and bot construction instead of paying it inside setup_hook.
+    """
+    configure_ssl()
+    for name in PRELOAD_MODULES:
+        importlib.import_module(name)
+
+
+async def load_extension_timed(bot: commands.Bot, name: str) -> None:
+    """Load a single extension and log how long it took.
+
+    Args:
+        bot: The Discord bot instance.
+        name: The dotted module path of the extension.
+    """
+    start = time.perf_counter()
+    await bot.load_extension(name)
+    logger.debug(f"Loaded extension {name} in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+class MusicBot(commands.Bot):
+    """Discord bot that loads the music command extensions on startup."""
+
+    async def setup_hook(self) -> None:
+        """Initialize the bot with extensions and other setup tasks.
+
+        This method is automatically called by discord.py during bot initialization.
+        """
+        await asyncio.gather(*(load_extension_timed(self, name) for name in EXTENSIONS))
+        logger.debug("All extensions loaded")
 
 
 def main() -> None:
     """Initialize and run the Discord bot.
 
     This function:
-    1. Sets up logging
-    2. Configures SSL verification
+    1. Configures SSL verification and preloads heavy modules in the background
+    2. Sets up logging
     3. Sets up the bot with appropriate intents
     4. Registers event handlers
     5. Loads command extensions
     6. Starts the bot
     """
+    # Configure SSL verification and warm heavy imports in the background
+    preload_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="preload")
+    preload = preload_executor.submit(_preload)
+    preload_executor.shutdown(wait=False)
+
     # Set up logging
     setup_logger()
 
-    # Configure SSL verification
-    configure_ssl()
-
-    # Set up the bot with command prefix
-    intents = discord.Intents.default()
-    intents.message_content = True
+    # Only subscribe to the gateway events the bot handles: guild and voice state
+    # updates for voice connections, and message content for prefix commands
+    intents = discord.Intents(guilds=True, voice_states=True, messages=True, message_content=True)
 
     # Configure SSL verification for discord.py
     if not SSL_VERIFY:
@@ -40,24 +94,16 @@ def main() -> None:
         logger.warning(
             "SSL certificate verification is disabled. This is not recommended for production use."
         )
-        bot = commands.Bot(command_prefix=COMMAND_PREFIX, intents=intents, ssl=False)
+        bot = MusicBot(
+            command_prefix=COMMAND_PREFIX,
+            intents=intents,
+            chunk_guilds_at_startup=False,
+            ssl=False,
+        )
     else:
-        bot = commands.Bot(command_prefix=COMMAND_PREFIX, intents=intents)
-
-    # Load command extensions using setup_hook
-    async def setup_hook() -> None:
-        """Initialize the bot with extensions and other setup tasks.
-
-        This method is automatically called by discord.py during bot initialization.
-        """
-        await bot.load_extension("src.commands.voice_commands")
-        await bot.load_extension("src.commands.playback_commands")
-        await bot.load_extension("src.commands.queue_commands")
-        await bot.load_extension("src.commands.youtube_commands")
-        logger.debug("All extensions loaded")
-
-    # Assign the setup_hook method to the bot
-    bot.setup_hook = setup_hook
+        bot = MusicBot(
+            command_prefix=COMMAND_PREFIX, intents=intents, chunk_guilds_at_startup=False
+        )
 
     # Bot events
     @bot.event
@@ -75,7 +121,7 @@ def main() -> None:
         if YOUTUBE_AUTH_ON_STARTUP:
             logger.info("YouTube authentication on startup is enabled")
             try:
-                authenticate_youtube()
+                await warmup_youtube()
                 logger.info("Successfully authenticated with YouTube API!")
             except Exception as e:
                 logger.error(f"Failed to authenticate with YouTube API: {str(e)}")
@@ -86,6 +132,9 @@ def main() -> None:
                 "Use the !connect_youtube command to authenticate with YouTube API when needed"
             )
 
+    # SSL must be configured before any connection is opened
+    preload.result()
+
     # Run the bot
     bot.run(TOKEN)
 
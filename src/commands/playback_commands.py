@@ -1,13 +1,48 @@
 import asyncio
-from collections import deque
+import re
+from collections import defaultdict
 
 from discord.ext import commands
 from loguru import logger
 
-from src.config import DEFAULT_VOLUME
-from src.player.queue_manager import play_next, queues, volumes
-from src.player.ytdl_source import YTDLSource
-from src.utils.youtube_api import search_youtube
+from src.player.queue_manager import schedule_play_next, states
+from src.player.ytdl_source import TrackedSource, YTDLSource
+from src.utils.youtube_api import search_youtube_cached
+
+# Precompiled query classifiers
+URL_PREFIXES = ("https://", "http://")
+PLAYLIST_PATTERN = re.compile(r"[?&]list=")
+# YouTube links pasted without a scheme, which would otherwise be sent to the search API
+SCHEMELESS_YOUTUBE_PATTERN = re.compile(
+    r"(?:(?:www|m|music)\.)?(?:youtube\.com|youtu\.be)/", re.IGNORECASE
+)
+
+# Maximum number of play requests resolved concurrently across all servers
+MAX_CONCURRENT_PLAY_REQUESTS = 8
+
+
+async def send_while(ctx, message, awaitable):
+    """Send a status message while an awaitable runs and return its result.
+
+    Sending and resolving overlap, so the Discord round-trip is hidden behind the
+    slower YouTube lookup instead of being added to it. The message is always
+    sent before this returns or raises, so later replies arrive after it.
+
+    Args:
+        ctx: The command context.
+        message: The message to send, or None to send nothing.
+        awaitable: The work to run while the message is being sent.
+
+    Returns:
+        The result of the awaitable.
+    """
+    if not message:
+        return await awaitable
+    send = asyncio.ensure_future(ctx.send(message))
+    try:
+        return await awaitable
+    finally:
+        await send
 
 
 class PlaybackCommands(commands.Cog):
@@ -23,8 +58,22 @@ class PlaybackCommands(commands.Cog):
             bot: The Discord bot instance.
         """
         self.bot = bot
+        # Serializes play requests per server so songs are queued in request order
+        self._guild_locks: defaultdict[int, asyncio.Lock] = defaultdict(asyncio.Lock)
+        # Bounds the number of play requests doing network I/O at the same time
+        self._gate = asyncio.Semaphore(MAX_CONCURRENT_PLAY_REQUESTS)
         logger.debug("PlaybackCommands cog initialized")
 
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild):
+        """Drop the play lock and playback state of a server the bot was removed from.
+
+        Args:
+            guild: The guild the bot left.
+        """
+        self._guild_locks.pop(guild.id, None)
+        states.pop(guild.id, None)
+
     @commands.command(name="play", help="To play a song or playlist (URL or search term)")
     async def play(self, ctx, *, query):
         """Play a song or playlist from a YouTube URL or search term.
@@ -42,111 +91,143 @@ class PlaybackCommands(commands.Cog):
         Returns:
             None
         """
+        # Wait for the server's turn before taking a gate slot, so requests queued
+        # behind each other in one server cannot hold every slot
+        async with self._guild_locks[ctx.guild.id]:
+            async with self._gate:
+                await self._play(ctx, query)
+
+    async def _play(self, ctx, query):
+        """Resolve the query, queue the result and start playback if idle.
+
+        Args:
+            ctx: The command context.
+            query: The YouTube URL (video or playlist) or search term.
+
+        Returns:
+            None
+        """
+        query = query.strip()
+        if SCHEMELESS_YOUTUBE_PATTERN.match(query):
+            query = f"https://{query}"
         try:
-            server = ctx.message.guild
+            server = ctx.guild
             server_id = server.id
             voice_channel = server.voice_client
             logger.info(
                 f"Play command invoked by {ctx.author} in server {server.name} (ID: {server_id})"
             )
-            logger.debug(f"Query: {query}")
+            logger.debug("Query: {}", query)
 
             if not voice_channel:
                 logger.warning(f"Bot not connected to voice channel in server {server.name}")
                 await ctx.send("Bot is not connected to a voice channel. Use !join first.")
                 return
 
-            # Initialize queue for this server if it doesn't exist
-            if server_id not in queues:
-                logger.debug(f"Initializing queue for server {server.name}")
-                queues[server_id] = deque()
+            state = states[server_id]
+            volume = state.volume
+
+            if not state.free_slots():
+                logger.warning(f"Queue is full in server {server.name}")
+                await ctx.send("The queue is full. Wait for some songs to finish or use !clear.")
+                return
 
-            # Initialize volume for this server if it doesn't exist
-            if server_id not in volumes:
-                logger.debug(f"Initializing volume for server {server.name}")
-                volumes[server_id] = DEFAULT_VOLUME  # Default to 50%
+            # Status message sent while the song is being resolved
+            notice = None
 
             async with ctx.typing():
                 # Check if the query is a URL or a search term
-                if not query.startswith("https://"):
-                    logger.debug(f"Search query detected: {query}")
-                    await ctx.send(f"Searching for: {query}...")
-
-                    # Try to use authenticated YouTube API first
-                    logger.debug("Attempting to search using authenticated YouTube API")
-                    videos = await search_youtube(query)
-
-                    if videos and len(videos) > 0:
-                        # Use the first result from authenticated search
-                        logger.info(f"Found video via API: {videos[0]['title']}")
-                        await ctx.send(f"Found: {videos[0]['title']} (using your YouTube account)")
-                        query = videos[0]["url"]
-                        logger.debug(f"Using URL: {query}")
+                if not query.startswith(URL_PREFIXES):
+                    logger.debug("Search query detected: {}", query)
+
+                    # Search with the authenticated YouTube API, or yt-dlp without it
+                    logger.debug("Searching YouTube for the query")
+                    videos = await send_while(
+                        ctx, f"Searching for: {query}...", search_youtube_cached(query)
+                    )
+
+                    if videos:
+                        # Use the first result
+                        video = videos[0]
+                        if video.from_account:
+                            logger.info(f"Found video via API: {video.title}")
+                            notice = f"Found: {video.title} (using your YouTube account)"
+                        else:
+                            logger.info(f"Found video via yt-dlp search: {video.title}")
+                            notice = f"Found: {video.title} (using anonymous YouTube search)"
+                        query = video.url
+                        logger.debug("Using URL: {}", query)
                     else:
-                        # Fall back to yt-dlp search if API search fails
-                        logger.warning("YouTube API search failed, falling back to yt-dlp")
-                        await ctx.send(
-                            "Using anonymous YouTube search (not connected to your account)"
-                        )
+                        # Let yt-dlp resolve the search itself if both searches failed
+                        logger.warning("YouTube search failed, falling back to yt-dlp")
+                        notice = "Using anonymous YouTube search (not connected to your account)"
                         query = f"ytsearch:{query}"
-                        logger.debug(f"Using search query: {query}")
+                        logger.debug("Using search query: {}", query)
 
-                # Check if the URL is a playlist
-                is_playlist = "playlist" in query or "list=" in query
-                logger.debug(f"Is playlist: {is_playlist}")
+                # Check if the URL is a playlist (a list= query parameter, which also
+                # covers youtube.com/playlist?list=...)
+                is_playlist = bool(PLAYLIST_PATTERN.search(query))
+                logger.debug("Is playlist: {}", is_playlist)
 
                 if is_playlist:
                     logger.info(f"Processing playlist: {query}")
-                    await ctx.send("Detected a playlist. Processing all songs...")
                     # Use the from_playlist method to get all songs from the playlist
                     logger.debug("Fetching playlist items")
-                    song_infos, skipped_entries = await YTDLSource.from_playlist(
-                        query,
-                        loop=self.bot.loop,
-                        stream=True,
-                        volume=volumes[server_id],
+                    song_infos, skipped_entries = await send_while(
+                        ctx,
+                        "Detected a playlist. Processing all songs...",
+                        YTDLSource.from_playlist(
+                            query,
+                            loop=self.bot.loop,
+                            stream=True,
+                            volume=volume,
+                        ),
                     )
 
-                    # Add all songs to the queue
+                    # Add as many songs as fit to the queue
+                    free_slots = state.free_slots()
+                    dropped_count = max(len(song_infos) - free_slots, 0)
+                    if dropped_count:
+                        logger.warning(f"Queue full, dropping {dropped_count} playlist songs")
+                        song_infos = song_infos[:free_slots]
                     logger.info(f"Adding {len(song_infos)} songs from playlist to queue")
-                    for song_info in song_infos:
-                        queues[server_id].append(song_info)
-                        logger.debug(f"Added to queue: {song_info.title}")
+                    state.queue.extend(song_infos)
 
-                    # Inform about successfully added songs
-                    await ctx.send(f"Added {len(song_infos)} songs from playlist to the queue.")
-
-                    # Inform about any skipped videos
+                    # Report added, dropped and skipped songs in a single message
+                    report = [f"Added {len(song_infos)} songs from playlist to the queue."]
+                    if dropped_count:
+                        report.append(f"The queue is full, {dropped_count} songs were not added.")
                     if skipped_entries:
                         logger.warning(f"{len(skipped_entries)} videos were skipped due to errors")
-                        skipped_message = "The following videos were skipped due to errors:\n"
                         # Limit the number of skipped entries to show to avoid message length issues
                         max_entries_to_show = 1
-                        if len(skipped_entries) > max_entries_to_show:
-                            shown_entries = skipped_entries[:max_entries_to_show]
-                            skipped_message += "\n".join(shown_entries)
-                            skipped_message += (
-                                f"\n...and {len(skipped_entries) - max_entries_to_show} more."
-                            )
-                        else:
-                            skipped_message += "\n".join(skipped_entries)
-
-                        await ctx.send(skipped_message)
+                        shown_entries = skipped_entries[:max_entries_to_show]
+                        hidden_count = len(skipped_entries) - len(shown_entries)
+                        report.append("The following videos were skipped due to errors:")
+                        report.extend(shown_entries)
+                        if hidden_count:
+                            report.append(f"...and {hidden_count} more.")
+
+                    await ctx.send("\n".join(report))
                 else:
                     # Use the server's volume setting for a single song
                     logger.info(f"Processing single song: {query}")
-                    logger.debug(f"Using volume: {volumes[server_id]}")
+                    logger.debug("Using volume: {}", volume)
                     try:
                         # Get song info without creating the source yet
-                        song_info = await YTDLSource.from_url(
-                            query,
-                            loop=self.bot.loop,
-                            stream=True,
-                            volume=volumes[server_id],
+                        song_info = await send_while(
+                            ctx,
+                            notice,
+                            YTDLSource.from_url(
+                                query,
+                                loop=self.bot.loop,
+                                stream=True,
+                                volume=volume,
+                            ),
                         )
 
                         # Add the song info to the queue
-                        queues[server_id].append(song_info)
+                        state.queue.append(song_info)
                         logger.info(f"Added to queue: {song_info.title}")
                         await ctx.send(f"Added to queue: {song_info.title}")
                     except Exception as e:
@@ -154,10 +235,9 @@ class PlaybackCommands(commands.Cog):
                         await ctx.send(f"Could not add song to queue: {str(e)}")
                         return
 
-                # If nothing is currently playing, start playing
-                if not voice_channel.is_playing() and not voice_channel.is_paused():
-                    logger.info("Nothing currently playing, starting playback")
-                    await play_next(ctx, self.bot)
+                # Start playing unless something is already playing or paused; play_next
+                # checks the voice client state under the server's playback lock
+                schedule_play_next(ctx, self.bot)
 
         except Exception as e:
             logger.error(f"Error in play command: {str(e)}", exc_info=True)
@@ -174,10 +254,10 @@ class PlaybackCommands(commands.Cog):
         Returns:
             None
         """
-        server = ctx.message.guild
+        server = ctx.guild
         logger.info(f"Pause command invoked by {ctx.author} in server {server.name}")
 
-        voice_client = server.voice_client
+        voice_client = ctx.voice_client
         if voice_client is None:
             logger.warning(f"Bot not connected to voice channel in server {server.name}")
             await ctx.send("Bot is not connected to a voice channel.")
@@ -200,10 +280,10 @@ class PlaybackCommands(commands.Cog):
         Returns:
             None
         """
-        server = ctx.message.guild
+        server = ctx.guild
         logger.info(f"Resume command invoked by {ctx.author} in server {server.name}")
 
-        voice_client = server.voice_client
+        voice_client = ctx.voice_client
         if voice_client is None:
             logger.warning(f"Bot not connected to voice channel in server {server.name}")
             await ctx.send("Bot is not connected to a voice channel.")
@@ -226,10 +306,10 @@ class PlaybackCommands(commands.Cog):
         Returns:
             None
         """
-        server = ctx.message.guild
+        server = ctx.guild
         logger.info(f"Stop command invoked by {ctx.author} in server {server.name}")
 
-        voice_client = server.voice_client
+        voice_client = ctx.voice_client
         if voice_client is None:
             logger.warning(f"Bot not connected to voice channel in server {server.name}")
             await ctx.send("Bot is not connected to a voice channel.")
@@ -237,10 +317,12 @@ class PlaybackCommands(commands.Cog):
 
         if voice_client.is_playing():
             logger.info("Stopping playback")
+            source = voice_client.source
             voice_client.stop()
             # Ensure FFmpeg process is properly terminated
             logger.debug("Waiting for FFmpeg process to terminate")
-            await asyncio.sleep(0.5)  # Give a moment for the process to terminate
+            if isinstance(source, TrackedSource) and not await source.wait_finished():
+                logger.warning("FFmpeg process did not terminate in time")
         else:
             logger.warning("Nothing is currently playing, cannot stop")
             await ctx.send("The bot is not playing anything at the moment.")
@@ -255,10 +337,10 @@ class PlaybackCommands(commands.Cog):
         Returns:
             None
         """
-        server = ctx.message.guild
+        server = ctx.guild
         logger.info(f"Skip command invoked by {ctx.author} in server {server.name}")
 
-        voice_client = server.voice_client
+        voice_client = ctx.voice_client
         if voice_client is None:
             logger.warning(f"Bot not connected to voice channel in server {server.name}")
             await ctx.send("Bot is not connected to a voice channel.")
@@ -266,10 +348,12 @@ class PlaybackCommands(commands.Cog):
 
         if voice_client.is_playing():
             logger.info("Skipping current song")
+            source = voice_client.source
             voice_client.stop()  # Stopping will trigger the after function which plays the next song
             # Ensure FFmpeg process is properly terminated
             logger.debug("Waiting for FFmpeg process to terminate")
-            await asyncio.sleep(0.5)  # Give a moment for the process to terminate
+            if isinstance(source, TrackedSource) and not await source.wait_finished():
+                logger.warning("FFmpeg process did not terminate in time")
             await ctx.send("Skipped the current song.")
         else:
             logger.warning("Nothing is currently playing, cannot skip")
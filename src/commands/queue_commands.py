@@ -1,7 +1,48 @@
+import discord
 from discord.ext import commands
 
-from src.config import DEFAULT_VOLUME
-from src.player.queue_manager import queues, volumes
+from src.player.queue_manager import states
+
+# Discord rejects messages longer than this many characters
+MESSAGE_LIMIT = 2000
+
+# Maximum number of messages sent for a single queue listing
+MAX_QUEUE_MESSAGES = 5
+
+
+def paginate(lines, limit=MESSAGE_LIMIT, max_messages=MAX_QUEUE_MESSAGES):
+    """Group lines into messages that fit within Discord's message length limit.
+
+    Lines that do not fit in `max_messages` messages are summarized in a final
+    "...and N more" line.
+
+    Args:
+        lines: The lines to send.
+        limit: The maximum length of a single message.
+        max_messages: The maximum number of messages to return.
+
+    Returns:
+        A list of message strings.
+    """
+    # Leave room in every message for the "...and N more." summary line
+    budget = limit - 32
+    messages = []
+    current = []
+    length = 0
+    for index, line in enumerate(lines):
+        line = line[:budget]
+        if current and length + len(line) > budget:
+            messages.append("\n".join(current))
+            current = []
+            length = 0
+            if len(messages) == max_messages:
+                messages[-1] += f"\n...and {len(lines) - index} more."
+                return messages
+        current.append(line)
+        length += len(line) + 1
+    if current:
+        messages.append("\n".join(current))
+    return messages
 
 
 class QueueCommands(commands.Cog):
@@ -29,13 +70,11 @@ class QueueCommands(commands.Cog):
         Returns:
             None
         """
-        server_id = ctx.guild.id
-        if server_id in queues and queues[server_id]:
-            queue_list = list(queues[server_id])
-            response = "**Current Queue:**\n"
-            for i, song in enumerate(queue_list, 1):
-                response += f"{i}. {song.title}\n"
-            await ctx.send(response)
+        state = states.get(ctx.guild.id)
+        if state and state.queue:
+            lines = [f"{i}. {song.title}" for i, song in enumerate(state.queue, 1)]
+            for message in paginate(["**Current Queue:**", *lines]):
+                await ctx.send(message)
         else:
             await ctx.send("The queue is empty.")
 
@@ -49,9 +88,9 @@ class QueueCommands(commands.Cog):
         Returns:
             None
         """
-        server_id = ctx.guild.id
-        if server_id in queues:
-            queues[server_id].clear()
+        state = states.get(ctx.guild.id)
+        if state:
+            state.queue.clear()
             await ctx.send("Queue cleared.")
         else:
             await ctx.send("The queue is already empty.")
@@ -70,16 +109,12 @@ class QueueCommands(commands.Cog):
         Returns:
             None
         """
-        server_id = ctx.guild.id
-        voice_client = ctx.guild.voice_client
-
-        # Initialize volume for this server if it doesn't exist
-        if server_id not in volumes:
-            volumes[server_id] = DEFAULT_VOLUME  # Default to 50%
+        state = states[ctx.guild.id]
+        voice_client = ctx.voice_client
 
         # If no volume specified, show current volume
         if volume_percent is None:
-            current_percent = int(volumes[server_id] * 100)
+            current_percent = int(state.volume * 100)
             await ctx.send(f"Current volume: {current_percent}%")
             return
 
@@ -92,11 +127,16 @@ class QueueCommands(commands.Cog):
         new_volume = volume_percent / 100
 
         # Store the new volume
-        volumes[server_id] = new_volume
+        state.volume = new_volume
 
-        # Update the volume of the currently playing source if there is one
-        if voice_client and voice_client.source:
+        # Update the volume of the currently playing source if it supports it; sources
+        # played at full volume (Opus passthrough or unscaled PCM) cannot change their
+        # volume, so the new volume applies from the next song
+        if voice_client and isinstance(voice_client.source, discord.PCMVolumeTransformer):
             voice_client.source.volume = new_volume
+        elif voice_client and voice_client.source:
+            await ctx.send(f"Volume set to {volume_percent}%, starting with the next song")
+            return
 
         await ctx.send(f"Volume set to {volume_percent}%")
 
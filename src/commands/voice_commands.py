@@ -25,12 +25,13 @@ class VoiceCommands(commands.Cog):
         Returns:
             None
         """
-        if not ctx.message.author.voice:
-            await ctx.send(f"{ctx.message.author.name} is not connected to a voice channel")
+        author = ctx.author
+        voice_state = author.voice
+        if not voice_state:
+            await ctx.send(f"{author.name} is not connected to a voice channel")
             return
 
-        channel = ctx.message.author.voice.channel
-        await channel.connect()
+        await voice_state.channel.connect()
 
     @commands.command(name="leave", help="To make the bot leave the voice channel")
     async def leave(self, ctx):
@@ -42,7 +43,7 @@ class VoiceCommands(commands.Cog):
         Returns:
             None
         """
-        voice_client = ctx.message.guild.voice_client
+        voice_client = ctx.voice_client
         if voice_client is None:
             await ctx.send("The bot is not connected to a voice channel.")
             return
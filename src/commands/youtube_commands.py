@@ -1,9 +1,15 @@
+import asyncio
 import os
 
 from discord.ext import commands
 
-from src.config import TOKEN_PICKLE_PATH
-from src.utils.youtube_api import authenticate_youtube
+from src.config import TOKEN_PATH, TOKEN_PICKLE_PATH
+from src.player.ytdl_source import clear_extract_caches
+from src.utils.youtube_api import (
+    authenticate_youtube,
+    clear_search_caches,
+    start_token_refresh,
+)
 
 
 class YouTubeCommands(commands.Cog):
@@ -38,14 +44,24 @@ class YouTubeCommands(commands.Cog):
         """
         await ctx.send("Attempting to connect to your YouTube account...")
 
-        # Delete existing token to force re-authentication
-        if os.path.exists(TOKEN_PICKLE_PATH):
-            os.remove(TOKEN_PICKLE_PATH)
+        # Delete existing tokens to force re-authentication. Blocking file and network
+        # work runs in a thread so playback in other servers is not stalled.
+        removed = False
+        for path in (TOKEN_PATH, TOKEN_PICKLE_PATH):
+            try:
+                await asyncio.to_thread(os.remove, path)
+                removed = True
+            except FileNotFoundError:
+                pass
+        if removed:
             await ctx.send("Removed existing YouTube authentication.")
 
         try:
             # Re-authenticate with YouTube
-            authenticate_youtube()
+            await asyncio.to_thread(authenticate_youtube, force=True)
+            start_token_refresh()
+            # Drop results from the previous account or from anonymous searches
+            await clear_search_caches()
             await ctx.send(
                 "✅ Successfully connected to your YouTube account! Your searches will now use your account's preferences and history."
             )
@@ -54,6 +70,29 @@ class YouTubeCommands(commands.Cog):
             await ctx.send("Make sure you've set up your YouTube API credentials in the .env file.")
             await ctx.send("The bot will continue to function using anonymous YouTube access.")
 
+    @commands.command(
+        name="clear_cache", help="Clear cached video metadata and search results (bot owner only)"
+    )
+    @commands.is_owner()
+    async def clear_cache(self, ctx):
+        """Clear the in-memory and on-disk metadata and search result caches.
+
+        Useful when cached stream URLs stop working before they expire.
+
+        Args:
+            ctx: The command context.
+
+        Returns:
+            None
+        """
+        removed_metadata, removed_searches = await asyncio.gather(
+            clear_extract_caches(), clear_search_caches()
+        )
+        await ctx.send(
+            f"Cleared the caches ({removed_metadata} stored videos and playlists, "
+            f"{removed_searches} stored searches removed)."
+        )
+
 
 async def setup(bot):
     """Add the YouTubeCommands cog to the bot.
@@ -10,6 +10,7 @@ load_dotenv()
 TOKEN: str = os.getenv("DISCORD_TOKEN", "")  # Default to empty string if not set
 COMMAND_PREFIX = "!"
 DEFAULT_VOLUME = 0.05
+MAX_QUEUE_SIZE = 10000  # Maximum number of songs queued per server
 
 # Logging configuration
 VERBOSE_MODE = os.getenv("VERBOSE_MODE", "False").lower() == "true"
@@ -20,10 +21,21 @@ YOUTUBE_CLIENT_SECRET = os.getenv("YOUTUBE_CLIENT_SECRET")
 YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
 SCOPES = ["https://www.googleapis.com/auth/youtube.readonly"]
 
+# YouTube API search cache (entries, and seconds to keep searches with and without results)
+SEARCH_CACHE_SIZE = int(os.getenv("SEARCH_CACHE_SIZE", "1024"))
+SEARCH_CACHE_TTL = int(os.getenv("SEARCH_CACHE_TTL", "86400"))
+EMPTY_SEARCH_CACHE_TTL = int(os.getenv("EMPTY_SEARCH_CACHE_TTL", "10800"))
+
+# Number of extracted videos kept in the on-disk metadata cache
+METADATA_CACHE_SIZE = int(os.getenv("METADATA_CACHE_SIZE", "2000"))
+
 # YouTube cookies file path (for accessing age-restricted or private videos)
 COOKIES_FILE = os.getenv("YOUTUBE_COOKIES_FILE", None)
 
-# Get token.pickle path from environment variable or use default
+# Path of the stored YouTube OAuth token (JSON)
+TOKEN_PATH = os.getenv("TOKEN_PATH", "token.json")
+
+# Path of the pickled token written by older versions, migrated to TOKEN_PATH on first use
 TOKEN_PICKLE_PATH = os.getenv("TOKEN_PICKLE_PATH", "token.pickle")
 
 # SSL verification setting (set to 'False' to disable SSL verification if you're having certificate issues)
@@ -0,0 +1,156 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+from loguru import logger
+
+from src.config import METADATA_CACHE_SIZE
+
+# Cache configuration
+CACHE_PATH = Path("data") / "metadata_cache.sqlite3"
+MAX_ENTRIES = METADATA_CACHE_SIZE  # Least recently used entries beyond this are evicted
+EXPIRY_MARGIN = 60  # Treat stream URLs as expired this many seconds early
+
+# Video ID in the URL forms YouTube uses for a single video
+VIDEO_ID_PATTERN = re.compile(r"(?:[?&]v=|youtu\.be/|/shorts/|/embed/|/live/)([A-Za-z0-9_-]{11})")
+
+# Large info fields that are not needed for playback and are not stored
+UNCACHED_FIELDS = (
+    "formats",
+    "requested_formats",
+    "thumbnails",
+    "automatic_captions",
+    "subtitles",
+    "heatmap",
+    "chapters",
+    "description",
+)
+
+
+def video_id_from_url(url: str) -> Optional[str]:
+    """
+    Return the YouTube video ID of a watch, youtu.be, shorts, embed or live URL, or None.
+    """
+    match = VIDEO_ID_PATTERN.search(url)
+    return match.group(1) if match else None
+
+
+def playlist_id_from_url(url: str) -> Optional[str]:
+    """
+    Return the YouTube playlist ID in the list= parameter of a URL, or None.
+    """
+    return parse_qs(urlparse(url).query).get("list", [None])[0]
+
+
+def stream_url_expiry(stream_url: Optional[str]) -> Optional[float]:
+    """
+    Return the expiry timestamp embedded in a signed googlevideo URL, or None.
+    """
+    if not stream_url:
+        return None
+    expire = parse_qs(urlparse(stream_url).query).get("expire", [None])[0]
+    return float(expire) if expire and expire.isdigit() else None
+
+
+class MetadataCache:
+    """
+    SQLite-backed cache of extracted video info, keyed by YouTube video ID.
+
+    Other JSON-serializable lookups, such as search results, can be stored in
+    their own instance under any string key.
+
+    Entries expire together with the signed stream URL they contain, and the least
+    recently used entries are evicted once `max_entries` is exceeded. Methods block
+    on disk I/O and are meant to be called from an executor thread.
+    """
+
+    def __init__(self, path: Path = CACHE_PATH, max_entries: int = MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS metadata ("
+                "video_id TEXT PRIMARY KEY, info TEXT NOT NULL, "
+                "expires REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def get(self, video_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the cached info for `video_id`, or None if missing or expired.
+        """
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connect()
+                row = conn.execute(
+                    "SELECT info, expires FROM metadata WHERE video_id = ?", (video_id,)
+                ).fetchone()
+                if row is None:
+                    return None
+                if row[1] <= now:
+                    conn.execute("DELETE FROM metadata WHERE video_id = ?", (video_id,))
+                    conn.commit()
+                    return None
+                conn.execute("UPDATE metadata SET accessed = ? WHERE video_id = ?", (now, video_id))
+                conn.commit()
+            return json.loads(row[0])
+        except (sqlite3.Error, ValueError) as exc:
+            logger.warning(f"Metadata cache lookup failed for {video_id}: {exc}")
+            return None
+
+    def put(self, video_id: str, info: Dict[str, Any], ttl: float) -> None:
+        """
+        Store `info` for `video_id` until its stream URL expires, or for `ttl` seconds.
+        """
+        now = time.time()
+        url_expiry = stream_url_expiry(info.get("url"))
+        expires = url_expiry - EXPIRY_MARGIN if url_expiry else now + ttl
+        stored = {key: value for key, value in info.items() if key not in UNCACHED_FIELDS}
+        try:
+            payload = json.dumps(stored, default=str)
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO metadata VALUES (?, ?, ?, ?)",
+                    (video_id, payload, expires, now),
+                )
+                conn.execute(
+                    "DELETE FROM metadata WHERE video_id IN ("
+                    "SELECT video_id FROM metadata ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+                conn.commit()
+        except (sqlite3.Error, TypeError, ValueError) as exc:
+            logger.warning(f"Failed to cache metadata for {video_id}: {exc}")
+
+    def clear(self) -> int:
+        """
+        Remove every entry and return how many were removed.
+        """
+        try:
+            with self._lock:
+                conn = self._connect()
+                removed = conn.execute("DELETE FROM metadata").rowcount
+                conn.commit()
+            return removed
+        except sqlite3.Error as exc:
+            logger.warning(f"Failed to clear metadata cache: {exc}")
+            return 0
+
+
+# Shared cache instance, opened on first use
+metadata_cache = MetadataCache()
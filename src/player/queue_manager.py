@@ -1,12 +1,48 @@
 import asyncio
-from collections import deque
+from collections import defaultdict, deque
+from itertools import islice
+from dataclasses import dataclass, field
+
 from loguru import logger
 
-# Music queue for each server
-queues: dict[int, deque] = {}
+from src.config import DEFAULT_VOLUME, MAX_QUEUE_SIZE
+
+# Number of upcoming songs resolved ahead of time, and how many of those
+# extractions may run at once
+PREFETCH_COUNT = 3
+PREFETCH_CONCURRENCY = 4
+
+
+@dataclass(slots=True)
+class ServerState:
+    """Per-server playback state.
+
+    Attributes:
+        queue: Songs waiting to be played.
+        volume: Playback volume between 0.0 and 1.0.
+        lock: Serializes starting playback so two callers cannot pop the same song.
+    """
+
+    queue: deque = field(default_factory=deque)
+    volume: float = DEFAULT_VOLUME
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
 
-# Volume levels for each server (default: 10%)
-volumes: dict[int, float] = {}
+    def free_slots(self):
+        """Return how many more songs fit in the queue before MAX_QUEUE_SIZE."""
+        return max(MAX_QUEUE_SIZE - len(self.queue), 0)
+
+
+# Playback state for each server, created on first access
+states: defaultdict[int, ServerState] = defaultdict(ServerState)
+
+# Strong references to detached play_next tasks so they are not garbage collected
+background_tasks: set[asyncio.Task] = set()
+
+# Queued songs whose metadata is currently being extracted ahead of time
+prefetching: set = set()
+
+# Bounds background extractions across all servers to avoid rate limiting
+prefetch_semaphore = asyncio.Semaphore(PREFETCH_CONCURRENCY)
 
 
 async def play_next(ctx, bot):
@@ -18,6 +54,8 @@ async def play_next(ctx, bot):
     3. Plays it using the voice client
     4. Sets up a callback for when the song finishes
 
+    Songs whose source cannot be created are skipped in favour of the next one.
+
     Args:
         ctx: The command context.
         bot: The Discord bot instance.
@@ -26,43 +64,116 @@ async def play_next(ctx, bot):
         None
     """
     server_id = ctx.guild.id
-    logger.debug(f"Attempting to play next song for server {server_id}")
+    state = states[server_id]
+    logger.debug("Attempting to play next song for server {}", server_id)
 
-    if server_id in queues and queues[server_id]:
+    async with state.lock:
         voice_client = ctx.guild.voice_client
-        if voice_client and voice_client.is_connected():
+        if voice_client and (voice_client.is_playing() or voice_client.is_paused()):
+            # Another play_next call already started playback
+            logger.debug("Playback already active in server {}", server_id)
+            return
+
+        while state.queue:
+            if not voice_client or not voice_client.is_connected():
+                logger.warning(f"Voice client not connected for server {server_id}")
+                return
+
             # Get the next song from the queue
-            next_song = queues[server_id].popleft()
+            next_song = state.queue.popleft()
 
             # Check if next_song is a SongInfo object and create a source if needed
             from src.player.ytdl_source import SongInfo
+
             if isinstance(next_song, SongInfo):
-                logger.debug(f"Creating source for song: {next_song.title}")
+                logger.debug("Creating source for song: {}", next_song.title)
+                # Play at the server's current volume, which may have changed since the
+                # song was queued and decides whether the source can scale its volume
+                next_song.volume = state.volume
                 try:
                     # Create the source only when we're about to play it
                     next_song = await next_song.create_source(loop=bot.loop)
-                    logger.debug(f"Successfully created source for: {next_song.title}")
+                    logger.debug("Successfully created source for: {}", next_song.title)
                 except Exception as e:
                     logger.error(f"Error creating source: {str(e)}")
                     await ctx.send(f"Error playing {next_song.title}: {str(e)}")
                     # Try to play the next song instead
-                    await play_next(ctx, bot)
-                    return
+                    continue
 
             logger.info(f"Playing next song: {next_song.title} in server {server_id}")
 
             # Play the next song
             voice_client.play(next_song, after=lambda e: handle_playback_completion(ctx, e, bot))
 
+            # Resolve the following songs while this one plays
+            for song in islice(state.queue, PREFETCH_COUNT):
+                schedule_prefetch(song, bot)
+
             await ctx.send(f"Now playing: {next_song.title}")
-        else:
-            logger.warning(f"Voice client not connected for server {server_id}")
-    else:
+            return
+
         # No more songs in the queue
-        logger.debug(f"Queue is empty for server {server_id}")
+        logger.debug("Queue is empty for server {}", server_id)
         await ctx.send("Queue is empty. Add more songs with !play or !add")
 
 
+def schedule_play_next(ctx, bot):
+    """Start play_next in the background without waiting for playback to begin.
+
+    Exceptions raised by the task are logged instead of being silently dropped.
+
+    Args:
+        ctx: The command context.
+        bot: The Discord bot instance.
+
+    Returns:
+        The scheduled asyncio.Task.
+    """
+    task = bot.loop.create_task(play_next(ctx, bot))
+    background_tasks.add(task)
+    task.add_done_callback(_on_play_next_done)
+    return task
+
+
+def _on_play_next_done(task):
+    """Release a finished play_next task and log its exception, if any."""
+    background_tasks.discard(task)
+    if not task.cancelled() and task.exception():
+        logger.opt(exception=task.exception()).error("Error in background play_next task")
+
+
+def schedule_prefetch(song, bot):
+    """Extract the metadata of a queued song in the background.
+
+    Songs that are already resolved or being prefetched are left alone, so calling
+    this repeatedly for the same song is cheap.
+
+    Args:
+        song: The queued song, either a SongInfo stub or a ready source.
+        bot: The Discord bot instance.
+
+    Returns:
+        None
+    """
+    from src.player.ytdl_source import SongInfo
+
+    if not isinstance(song, SongInfo) or song.is_resolved or song in prefetching:
+        return
+    prefetching.add(song)
+    task = bot.loop.create_task(_prefetch(song, bot.loop))
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+
+
+async def _prefetch(song, loop):
+    """Prefetch a song's metadata, leaving failures for play_next to report."""
+    try:
+        async with prefetch_semaphore:
+            await song.prefetch(loop=loop)
+    finally:
+        prefetching.discard(song)
+
+
 def handle_playback_completion(ctx, error, bot):
     """Handle completion of song playback, including errors.
 
@@ -82,19 +193,37 @@ def handle_playback_completion(ctx, error, bot):
     if error:
         logger.error(f"Player error in server {server_id}: {error}")
 
-    # Add a small delay to ensure proper cleanup
-    asyncio.run_coroutine_threadsafe(asyncio.sleep(1), bot.loop)
+    # Hand play_next over to the bot's event loop without waiting for it, so the
+    # audio player thread is released immediately.
+    logger.debug("Song finished, attempting to play next song in server {}", server_id)
+    bot.loop.call_soon_threadsafe(_start_play_next_or_cleanup, ctx, bot)
+
+
+def _start_play_next_or_cleanup(ctx, bot):
+    """Start play_next_or_cleanup on the event loop, keeping a reference to its task."""
+    task = bot.loop.create_task(play_next_or_cleanup(ctx, bot))
+    background_tasks.add(task)
+    task.add_done_callback(_on_play_next_done)
+
+
+async def play_next_or_cleanup(ctx, bot):
+    """Play the next song, cleaning up the voice client if that fails.
+
+    Args:
+        ctx: The command context.
+        bot: The Discord bot instance.
 
-    # Use run_coroutine_threadsafe to call play_next in the bot's event loop
-    logger.debug(f"Song finished, attempting to play next song in server {server_id}")
-    future = asyncio.run_coroutine_threadsafe(play_next(ctx, bot), bot.loop)
+    Returns:
+        None
+    """
+    server_id = ctx.guild.id
     try:
-        future.result()
+        await play_next(ctx, bot)
     except Exception as e:
         logger.exception(f"Error playing next song in server {server_id}: {e}")
         # Try to ensure the voice client is properly cleaned up
-        logger.debug(f"Cleaning up voice client for server {server_id}")
-        asyncio.run_coroutine_threadsafe(cleanup_voice_client(ctx), bot.loop)
+        logger.debug("Cleaning up voice client for server {}", server_id)
+        await cleanup_voice_client(ctx)
 
 
 async def cleanup_voice_client(ctx):
@@ -114,10 +243,10 @@ async def cleanup_voice_client(ctx):
         voice_client = ctx.guild.voice_client
         if voice_client:
             if voice_client.is_playing():
-                logger.debug(f"Stopping playback in server {server_id}")
+                logger.debug("Stopping playback in server {}", server_id)
                 voice_client.stop()
             if voice_client.is_connected():
-                logger.debug(f"Disconnecting from voice channel in server {server_id}")
+                logger.debug("Disconnecting from voice channel in server {}", server_id)
                 await voice_client.disconnect()
                 logger.info(f"Successfully disconnected from voice channel in server {server_id}")
     except Exception as e:
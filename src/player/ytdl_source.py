@@ -1,28 +1,50 @@
-import re
+import time
+import atexit
 import asyncio
-from typing import List, Optional, Tuple, Dict, Any, Union
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, List, Optional, Tuple, Dict, Any
 
 import discord
 import yt_dlp as youtube_dl
+from cachetools import TTLCache
 from loguru import logger
 
 from src.config import COOKIES_FILE, VERBOSE_MODE
+from src.player.meta_cache import (
+    metadata_cache,
+    playlist_id_from_url,
+    stream_url_expiry,
+    video_id_from_url,
+)
 
 # Constants
-MUSIC_YOUTUBE_PATTERN = r"music\.youtube\.com"
+MUSIC_YOUTUBE_HOST = "music.youtube.com"
 YOUTUBE_REPLACEMENT = "youtube.com"
 STREAMING_TIMEOUT = 60  # Timeout for streaming operations in seconds
+FFMPEG_TERMINATE_TIMEOUT = 0.5  # Max wait for FFmpeg to exit after stopping playback
 URL_EXPIRATION_TIME = 3600  # Cached URL expiration time in seconds
-
-# FFmpeg configuration
+PLAYLIST_CACHE_TTL = 3600  # Persisted playlist listings expire after this many seconds
+EXTRACT_CACHE_SIZE = 1024  # Recent extraction results kept in memory
+EXTRACT_CACHE_TTL = 300  # In-memory extraction cache lifetime in seconds
+STREAM_URL_MIN_LIFETIME = 30  # Re-extract stream URLs expiring this soon after the song ends
+MAX_PLAYBACK_MARGIN = 3600  # Longest song duration a stream URL must stay valid for
+YTDL_WORKERS = 16  # Threads dedicated to blocking yt-dlp extraction
+
+# FFmpeg configuration. Inputs are single audio streams whose codec is known from
+# the container header, so probing is kept to a minimum to start playback sooner.
 FFMPEG_BEFORE_OPTIONS = (
     "-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5 -timeout 10000000"
+    " -probesize 32k -analyzeduration 0"
 )
-FFMPEG_OPTIONS = "-vn -loglevel warning -bufsize 64k"
+FFMPEG_OPTIONS = "-vn -loglevel warning"
+FFMPEG_OPUS_OPTIONS = "-vn"  # Passthrough output options; FFmpegOpusAudio adds the rest
 
 # Default YouTube-DL options
 DEFAULT_YTDL_OPTIONS: Dict[str, Any] = {
-    "format": "bestaudio/best",
+    "format": "bestaudio[acodec=opus]/bestaudio/best",  # Prefer Opus, which can skip transcoding
     "outtmpl": "%(extractor)s-%(id)s-%(title)s.%(ext)s",
     "restrictfilenames": True,
     "nocheckcertificate": True,
@@ -34,6 +56,7 @@ DEFAULT_YTDL_OPTIONS: Dict[str, Any] = {
     "geo_bypass": True,
     "retries": 10,
     "socket_timeout": STREAMING_TIMEOUT,
+    "youtube_include_dash_manifest": False,  # Audio formats don't need the extra manifest fetch
     "extract_flat": True,  # Faster metadata extraction for playlists
     "skip_download": True,  # Avoids actual file downloading
     "logtostderr": VERBOSE_MODE,
@@ -42,20 +65,176 @@ DEFAULT_YTDL_OPTIONS: Dict[str, Any] = {
     "verbose": VERBOSE_MODE,
 }
 
-# Global YouTube-DL instance
-ytdl = youtube_dl.YoutubeDL(DEFAULT_YTDL_OPTIONS)
+# Options for the quick single-video lookup done when a song is queued
+BASIC_YTDL_OPTIONS: Dict[str, Any] = {
+    **DEFAULT_YTDL_OPTIONS,
+    "extract_flat": True,
+    "skip_download": True,
+    "noplaylist": True,
+}
+
+# Options for downloading a single video to disk
+DOWNLOAD_YTDL_OPTIONS: Dict[str, Any] = {
+    **DEFAULT_YTDL_OPTIONS,
+    "extract_flat": False,
+    "skip_download": False,
+    "noplaylist": True,
+}
+
+# Options for listing playlist entries without extracting each video
+PLAYLIST_YTDL_OPTIONS: Dict[str, Any] = {
+    **DEFAULT_YTDL_OPTIONS,
+    "extract_flat": "in_playlist",
+    "noplaylist": False,
+}
+
+# YouTube-DL instance used on the event loop thread to build download filenames
+ytdl = youtube_dl.YoutubeDL(DOWNLOAD_YTDL_OPTIONS)
+
+# YoutubeDL keeps per-extraction state and is not thread-safe, so every yt-dlp
+# worker thread builds its own instances once, when it starts
+_thread_ytdl = threading.local()
+
+
+def _init_ytdl_thread() -> None:
+    """
+    Build the YouTube-DL instances used by the current ytdl_executor worker.
+    """
+    _thread_ytdl.basic = youtube_dl.YoutubeDL(BASIC_YTDL_OPTIONS)
+    _thread_ytdl.download = youtube_dl.YoutubeDL(DOWNLOAD_YTDL_OPTIONS)
+    _thread_ytdl.playlist = youtube_dl.YoutubeDL(PLAYLIST_YTDL_OPTIONS)
+
+
+# Dedicated pool for yt-dlp so extraction bursts do not starve the default executor
+ytdl_executor = ThreadPoolExecutor(
+    max_workers=YTDL_WORKERS, thread_name_prefix="ytdl", initializer=_init_ytdl_thread
+)
+atexit.register(ytdl_executor.shutdown, wait=False)
+
+# Recent extraction results keyed by (extraction kind, URL), and the extractions
+# currently running under the same keys so concurrent requests share one call
+_extract_cache: TTLCache = TTLCache(maxsize=EXTRACT_CACHE_SIZE, ttl=EXTRACT_CACHE_TTL)
+_inflight_extractions: Dict[Tuple[str, str], asyncio.Future] = {}
+
+# Extraction cache lookups by outcome ("memory" hit, "disk" hit or "miss"), used to
+# tune the cache sizes and lifetimes
+extract_cache_stats: Counter = Counter()
 
 
 def convert_music_youtube_url(url: str) -> str:
     """
     Convert URLs from music.youtube.com to youtube.com.
     """
-    if re.search(MUSIC_YOUTUBE_PATTERN, url):
+    if MUSIC_YOUTUBE_HOST in url:
         logger.debug(f"Converting music.youtube.com URL to youtube.com: {url}")
-        return re.sub(MUSIC_YOUTUBE_PATTERN, YOUTUBE_REPLACEMENT, url)
+        return url.replace(MUSIC_YOUTUBE_HOST, YOUTUBE_REPLACEMENT, 1)
     return url
 
 
+def _cache_key(kind: str, url: str) -> Tuple[str, str]:
+    """
+    Build an extraction cache key, using the video ID so URL variants share an entry.
+    """
+    return kind, video_id_from_url(url) or url
+
+
+def _record_cache_miss(url: str) -> None:
+    """
+    Count an extraction that has to go to the network and log the running hit rate.
+    """
+    extract_cache_stats["miss"] += 1
+    lookups = sum(extract_cache_stats.values())
+    hits = lookups - extract_cache_stats["miss"]
+    logger.debug(
+        f"Extraction cache miss for {url} (hit rate {hits}/{lookups}, "
+        f"memory {extract_cache_stats['memory']}, disk {extract_cache_stats['disk']})"
+    )
+
+
+def _is_fresh(data: Dict[str, Any]) -> bool:
+    """
+    Check that the stream URL in extracted data, if any, stays valid while the song plays.
+    """
+    expiry = stream_url_expiry(data.get("url"))
+    playback = min(data.get("duration") or 0, MAX_PLAYBACK_MARGIN)
+    return expiry is None or expiry > time.time() + playback + STREAM_URL_MIN_LIFETIME
+
+
+async def _cached_extract(
+    key: Tuple[str, str],
+    extract: Callable[[], Optional[Dict[str, Any]]],
+    loop: asyncio.AbstractEventLoop,
+) -> Optional[Dict[str, Any]]:
+    """
+    Run the blocking `extract` callable in an executor, caching its result under `key`.
+
+    Identical concurrent calls wait for a single extraction. Empty results and
+    errors are not cached.
+    """
+    data = _extract_cache.get(key)
+    if data is not None:
+        if _is_fresh(data):
+            extract_cache_stats["memory"] += 1
+            logger.debug(f"Extraction cache hit for {key[1]}")
+            return data
+        _extract_cache.pop(key, None)
+
+    future = _inflight_extractions.get(key)
+    if future is None:
+        future = loop.run_in_executor(ytdl_executor, extract)
+        _inflight_extractions[key] = future
+        future.add_done_callback(lambda _: _inflight_extractions.pop(key, None))
+    else:
+        logger.debug(f"Joining in-flight extraction for {key[1]}")
+
+    # Shield the shared extraction so one cancelled caller does not cancel it for the others
+    data = await asyncio.shield(future)
+    if data:
+        _extract_cache[key] = data
+    return data
+
+
+def _search_flat(query: str, max_results: int) -> Optional[List[Dict[str, Any]]]:
+    """
+    Return the flat entries of a YouTube search. Must run on ytdl_executor.
+    """
+    data = _thread_ytdl.basic.extract_info(f"ytsearch{max_results}:{query}", download=False)
+    if not data:
+        return None
+    return [entry for entry in data.get("entries") or () if entry and entry.get("id")]
+
+
+async def search_videos(
+    query: str, max_results: int = 1, loop: Optional[asyncio.AbstractEventLoop] = None
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    Search YouTube with yt-dlp, which needs no account and uses no API quota.
+
+    Only the result listing is fetched. Returns the flat entries of the results,
+    each with at least an ID, or None if the search failed.
+    """
+    loop = loop or asyncio.get_running_loop()
+    return await loop.run_in_executor(ytdl_executor, _search_flat, query, max_results)
+
+
+async def clear_extract_caches() -> int:
+    """
+    Drop all cached extraction results, in memory and on disk.
+
+    The in-memory cache is cleared on the event loop, which is the only thread
+    using it. Returns the number of persisted entries removed.
+    """
+    _extract_cache.clear()
+    return await asyncio.to_thread(metadata_cache.clear)
+
+
+def _download(url: str) -> Optional[Dict[str, Any]]:
+    """
+    Download a single video to disk. Must run on ytdl_executor.
+    """
+    return _thread_ytdl.download.extract_info(url, download=True)
+
+
 class SongInfo:
     """
     Class for managing metadata related to a YouTube song/video.
@@ -67,37 +246,49 @@ class SongInfo:
         volume: float = 0.5,
         stream: bool = True,
         data: Optional[Dict[str, Any]] = None,
+        title: Optional[str] = None,
     ):
         self.url = url
         self.volume = volume
         self.stream = stream
         self.data = data
-        self.title = data.get("title", "Unknown Title") if data else "Loading..."
+        if title:
+            self.title = title
+        else:
+            self.title = data.get("title", "Unknown Title") if data else "Loading..."
 
         logger.debug(f"Created SongInfo: URL: {url}, Title: {self.title}")
 
+    @property
+    def is_resolved(self) -> bool:
+        """
+        Whether the extracted data is complete enough to create a source from.
+
+        Streams also need a stream URL that stays valid while the song plays, so
+        songs that waited in the queue too long are extracted again.
+        """
+        if not self.data:
+            return False
+        return not self.stream or ("url" in self.data and _is_fresh(self.data))
+
     async def extract_info(
         self, loop: Optional[asyncio.AbstractEventLoop] = None
     ) -> Dict[str, Any]:
         """
         Extract song metadata using yt-dlp.
         """
-        loop = loop or asyncio.get_event_loop()
-        extraction_options = DEFAULT_YTDL_OPTIONS.copy()
-        extraction_options.update(
-            {
-                "extract_flat": not self.stream,
-                "noplaylist": True,
-                "skip_download": self.stream,
-            }
-        )
-        temp_ytdl = youtube_dl.YoutubeDL(extraction_options)
+        loop = loop or asyncio.get_running_loop()
+        if self.stream:
+            # Streams share the quick lookup and its persistent metadata cache
+            key = _cache_key("basic", self.url)
+            extract = partial(YTDLSource._extract_cached, self.url)
+        else:
+            key = _cache_key("download", self.url)
+            extract = partial(_download, self.url)
 
         try:
             logger.debug(f"Extracting info for URL: {self.url}")
-            self.data = await loop.run_in_executor(
-                None, lambda: temp_ytdl.extract_info(self.url, download=not self.stream)
-            )
+            self.data = await _cached_extract(key, extract, loop)
 
             if not self.data:
                 raise ValueError(
@@ -112,14 +303,37 @@ class SongInfo:
             logger.error(f"Failed to extract info for {self.url}: {exc}")
             raise
 
-    async def create_source(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> "YTDLSource":
+    async def prefetch(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> bool:
         """
-        Create a YTDLSource instance for audio playback.
+        Extract song metadata ahead of playback without raising.
+
+        Returns whether the song is resolved afterwards; failures are retried by
+        `create_source` when the song is about to play.
         """
-        loop = loop or asyncio.get_event_loop()
+        if self.is_resolved:
+            return True
+        try:
+            await self.extract_info(loop=loop)
+        except Exception as exc:
+            logger.debug(f"Prefetch failed for {self.url}: {exc}")
+            return False
+        logger.debug(f"Prefetched upcoming song: {self.title}")
+        return True
+
+    async def create_source(
+        self, loop: Optional[asyncio.AbstractEventLoop] = None
+    ) -> "TrackedSource":
+        """
+        Create an audio source for playback.
+
+        At 100% volume no volume scaling is applied: Opus streams are passed
+        through to Discord without transcoding and other streams are played as
+        plain PCM. Otherwise the PCM is scaled so the volume can change mid-song.
+        """
+        loop = loop or asyncio.get_running_loop()
 
         # Re-extract information if needed (e.g., streaming URL expired)
-        if not self.data or (self.stream and "url" not in self.data):
+        if not self.is_resolved:
             self.data = await self.extract_info(loop=loop)
 
         # Ensure a valid streaming URL or local filename is available
@@ -129,29 +343,118 @@ class SongInfo:
 
         logger.debug(f"Creating audio source with filename: {filename}")
 
-        # Create FFmpeg audio stream
-        source = YTDLSource(
-            discord.FFmpegPCMAudio(
-                filename, before_options=FFMPEG_BEFORE_OPTIONS, options=FFMPEG_OPTIONS
-            ),
-            data=self.data,
-            volume=self.volume,
-        )
+        # Opus streams played at full volume need no PCM round-trip; copy them as is
+        if self.stream and self.volume >= 1.0 and self.data.get("acodec") == "opus":
+            source = OpusPassthroughSource(filename, data=self.data, loop=loop)
+        elif self.volume >= 1.0:
+            source = FullVolumeSource(filename, data=self.data, loop=loop)
+        else:
+            source = YTDLSource(
+                discord.FFmpegPCMAudio(
+                    filename, before_options=FFMPEG_BEFORE_OPTIONS, options=FFMPEG_OPTIONS
+                ),
+                data=self.data,
+                volume=self.volume,
+                loop=loop,
+            )
         logger.info(f"Audio source created for: {self.title}")
         return source
 
 
-class YTDLSource(discord.PCMVolumeTransformer):
+class TrackedSource:
     """
-    A source for playing audio from a YouTube video.
+    Song metadata and FFmpeg shutdown tracking shared by the playable sources.
     """
 
-    def __init__(self, source: discord.AudioSource, *, data: Dict[str, Any], volume: float = 0.5):
-        super().__init__(source, volume)
+    def _init_tracking(
+        self, data: Dict[str, Any], loop: Optional[asyncio.AbstractEventLoop]
+    ) -> None:
         self.data = data
         self.title = data.get("title", "Unknown Title")
         self.url = data.get("url", "")
         self.duration = data.get("duration", 0)
+        self._loop = loop
+        self._finished = asyncio.Event()
+
+    def cleanup(self) -> None:
+        """
+        Terminate the FFmpeg process and signal anyone waiting in `wait_finished`.
+
+        Called by discord.py from the audio player thread once playback ends.
+        """
+        super().cleanup()
+        if self._loop and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._finished.set)
+
+    async def wait_finished(self, timeout: float = FFMPEG_TERMINATE_TIMEOUT) -> bool:
+        """
+        Wait until the FFmpeg process backing this source has been cleaned up.
+
+        Returns False if it is still running after `timeout` seconds.
+        """
+        try:
+            await asyncio.wait_for(self._finished.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+
+class OpusPassthroughSource(TrackedSource, discord.FFmpegOpusAudio):
+    """
+    A source that copies an Opus stream to Discord without re-encoding it.
+
+    Its volume is fixed; volume changes apply from the next song.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        *,
+        data: Dict[str, Any],
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+    ):
+        super().__init__(
+            filename,
+            codec="copy",
+            before_options=FFMPEG_BEFORE_OPTIONS,
+            options=FFMPEG_OPUS_OPTIONS,
+        )
+        self._init_tracking(data, loop)
+
+
+class FullVolumeSource(TrackedSource, discord.FFmpegPCMAudio):
+    """
+    A PCM source played at full volume without per-frame volume scaling.
+
+    Its volume is fixed; volume changes apply from the next song.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        *,
+        data: Dict[str, Any],
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+    ):
+        super().__init__(filename, before_options=FFMPEG_BEFORE_OPTIONS, options=FFMPEG_OPTIONS)
+        self._init_tracking(data, loop)
+
+
+class YTDLSource(TrackedSource, discord.PCMVolumeTransformer):
+    """
+    A source for playing audio from a YouTube video.
+    """
+
+    def __init__(
+        self,
+        source: discord.AudioSource,
+        *,
+        data: Dict[str, Any],
+        volume: float = 0.5,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+    ):
+        super().__init__(source, volume)
+        self._init_tracking(data, loop)
 
     @classmethod
     async def from_url(
@@ -161,37 +464,66 @@ class YTDLSource(discord.PCMVolumeTransformer):
         loop: Optional[asyncio.AbstractEventLoop] = None,
         stream: bool = True,
         volume: float = 0.5,
-    ) -> Union["YTDLSource", SongInfo]:
+    ) -> SongInfo:
         """
-        Create a SongInfo instance or YTDLSource from a given YouTube URL.
+        Create a SongInfo instance from a given YouTube URL.
+
+        The FFmpeg source is only created once the song is about to play.
         """
         url = convert_music_youtube_url(url)
         logger.debug(f"Processing URL: {url}")
 
-        loop = loop or asyncio.get_event_loop()
-        basic_options = DEFAULT_YTDL_OPTIONS.copy()
-        basic_options.update({"extract_flat": True, "skip_download": True, "noplaylist": True})
-        temp_ytdl = youtube_dl.YoutubeDL(basic_options)
+        loop = loop or asyncio.get_running_loop()
 
         try:
-            # Extract basic info
-            data = await loop.run_in_executor(
-                None, lambda: temp_ytdl.extract_info(url, download=False)
+            # Extract basic info, reusing cached metadata for known videos
+            data = await _cached_extract(
+                _cache_key("basic", url), partial(cls._extract_cached, url), loop
             )
             if not data:
                 raise ValueError(f"Failed to get data for URL: {url}")
-
-            # If 'url' is already extracted, return YTDLSource immediately
-            song_info = SongInfo(url=url, volume=volume, stream=stream, data=data)
-            if stream:
-                return await song_info.create_source(loop=loop)
-
-            return song_info
+            # Reject results that cannot be played, such as an unresolved search, so
+            # they are not reported as queued and then skipped
+            if not data.get("url"):
+                raise ValueError(f"No playable audio found for: {url}")
+
+            # Queue the resolved watch URL rather than a search query, so a later
+            # re-extraction does not search again
+            return SongInfo(
+                url=data.get("webpage_url") or url, volume=volume, stream=stream, data=data
+            )
 
         except Exception as exc:
             logger.error(f"Error processing {url}: {exc}")
             raise
 
+    @classmethod
+    def _extract_cached(cls, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Return cached info for `url`, extracting and caching it on a miss.
+
+        Blocks on network and disk I/O, so it must run on ytdl_executor.
+        """
+        video_id = video_id_from_url(url)
+        if video_id:
+            data = metadata_cache.get(video_id)
+            if data and _is_fresh(data):
+                extract_cache_stats["disk"] += 1
+                logger.debug(f"Metadata cache hit for video {video_id}")
+                return data
+
+        _record_cache_miss(url)
+        data = _thread_ytdl.basic.extract_info(url, download=False)
+        if data and not data.get("url") and data.get("entries") is not None:
+            # Search queries come back as a flat listing; resolve its first result
+            entry = next((entry for entry in data["entries"] if entry and entry.get("url")), None)
+            return cls._extract_cached(entry["url"]) if entry else None
+        if data and video_id and data.get("url"):
+            metadata_cache.put(
+                video_id, youtube_dl.YoutubeDL.sanitize_info(data), ttl=URL_EXPIRATION_TIME
+            )
+        return data
+
     @classmethod
     async def from_playlist(
         cls,
@@ -200,43 +532,84 @@ class YTDLSource(discord.PCMVolumeTransformer):
         loop: Optional[asyncio.AbstractEventLoop] = None,
         stream: bool = True,
         volume: float = 0.5,
-    ) -> Tuple[List[Union["YTDLSource", SongInfo]], List[str]]:
+    ) -> Tuple[List[SongInfo], List[str]]:
         """
-        Create multiple SongInfo or YTDLSource instances from a YouTube playlist URL.
+        Create SongInfo instances from a YouTube playlist URL.
+
+        Only the playlist page is fetched; every entry becomes a SongInfo stub
+        whose metadata is extracted when it is about to play.
         """
         url = convert_music_youtube_url(url)
         logger.info(f"Processing playlist: {url}")
 
-        loop = loop or asyncio.get_event_loop()
-        playlist_options = DEFAULT_YTDL_OPTIONS.copy()
-        playlist_options.update({"extract_flat": True, "noplaylist": False})
-        temp_ytdl = youtube_dl.YoutubeDL(playlist_options)
+        loop = loop or asyncio.get_running_loop()
 
         try:
             # Extract playlist data
-            data = await loop.run_in_executor(
-                None, lambda: temp_ytdl.extract_info(url, download=False)
+            data = await _cached_extract(
+                ("playlist", url),
+                partial(cls._extract_playlist_cached, url),
+                loop,
             )
             if not data or "entries" not in data:
                 logger.warning(f"No valid playlist entries found for {url}")
                 return [], [f"No valid entries for playlist: {url}"]
 
-            sources: List[Union["YTDLSource", SongInfo]] = []
-            skipped = []
-
-            for entry in data["entries"]:
-                try:
-                    if not entry:
-                        continue
-                    source = await cls.from_url(
-                        entry["url"], loop=loop, stream=stream, volume=volume
-                    )
-                    sources.append(source)
-                except Exception as exc:
-                    skipped.append(str(exc))
-
-            return sources, skipped
+            return cls._playlist_stubs(data["entries"], stream=stream, volume=volume)
 
         except Exception as exc:
             logger.error(f"Error processing playlist {url}: {exc}")
             raise
+
+    @staticmethod
+    def _extract_playlist_cached(url: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the cached flat listing of a playlist, extracting and caching it on a miss.
+
+        Only the URL, ID and title of each entry are stored. Blocks on network and
+        disk I/O, so it must run on ytdl_executor.
+        """
+        playlist_id = playlist_id_from_url(url)
+        cache_key = f"playlist:{playlist_id}" if playlist_id else None
+        if cache_key:
+            data = metadata_cache.get(cache_key)
+            if data:
+                extract_cache_stats["disk"] += 1
+                logger.debug(f"Metadata cache hit for playlist {playlist_id}")
+                return data
+
+        _record_cache_miss(url)
+        data = _thread_ytdl.playlist.extract_info(url, download=False)
+        if data and cache_key and data.get("entries") is not None:
+            entries = [
+                {"url": entry.get("url"), "id": entry.get("id"), "title": entry.get("title")}
+                for entry in data["entries"]
+                if entry
+            ]
+            metadata_cache.put(
+                cache_key, {"title": data.get("title"), "entries": entries}, ttl=PLAYLIST_CACHE_TTL
+            )
+        return data
+
+    @staticmethod
+    def _playlist_stubs(
+        entries: List[Optional[Dict[str, Any]]], *, stream: bool, volume: float
+    ) -> Tuple[List[SongInfo], List[str]]:
+        """
+        Build SongInfo stubs from flat playlist entries without extracting them.
+        """
+        sources: List[SongInfo] = []
+        skipped = []
+        for entry in entries:
+            if not entry:
+                continue
+            entry_url = entry.get("url")
+            if not entry_url:
+                skipped.append(
+                    f"No URL for playlist entry: {entry.get('title') or entry.get('id') or 'Unknown'}"
+                )
+                continue
+            sources.append(
+                SongInfo(url=entry_url, volume=volume, stream=stream, title=entry.get("title"))
+            )
+        return sources, skipped
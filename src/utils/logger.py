@@ -23,21 +23,27 @@ def setup_logger():
     # Remove default handler
     logger.remove()
 
-    # Add file handler
+    # Add file handler, also written from a background thread so rotation and
+    # compression never run on the event loop
     logger.add(
         log_file,
         rotation="10 MB",  # Rotate when file reaches 10MB
         retention="1 week",  # Keep logs for 1 week
         compression="zip",  # Compress rotated logs
+        enqueue=True,
+        diagnose=VERBOSE_MODE,  # Only inspect variable values in tracebacks when verbose
         level="DEBUG" if VERBOSE_MODE else "INFO",
         format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {name}:{function}:{line} - {message}"
         if VERBOSE_MODE
         else "{time:YYYY-MM-DD HH:mm:ss} | {level} | {message}",
     )
 
-    # Add console handler
+    # Add console handler, written from a background thread so a slow terminal or pipe
+    # never blocks the event loop
     logger.add(
         sys.stderr,
+        enqueue=True,
+        diagnose=VERBOSE_MODE,
         level="DEBUG" if VERBOSE_MODE else "INFO",
         format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {name}:{function}:{line} - {message}"
         if VERBOSE_MODE
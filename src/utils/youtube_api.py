@@ -1,25 +1,115 @@
+import asyncio
+import atexit
+import json
 import os
 import pickle
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import NamedTuple
 
-from google.auth.transport.requests import Request
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+from cachetools import TTLCache
 from loguru import logger
 
-from src.config import SCOPES, TOKEN_PICKLE_PATH, YOUTUBE_CLIENT_ID, YOUTUBE_CLIENT_SECRET
+from src.config import (
+    EMPTY_SEARCH_CACHE_TTL,
+    SCOPES,
+    SEARCH_CACHE_SIZE,
+    SEARCH_CACHE_TTL,
+    TOKEN_PATH,
+    TOKEN_PICKLE_PATH,
+    YOUTUBE_CLIENT_ID,
+    YOUTUBE_CLIENT_SECRET,
+)
+from src.player.meta_cache import MetadataCache
 
-# YouTube API client
+# Refresh OAuth access tokens this many seconds before they expire, and retry a
+# failed background refresh after this many seconds
+TOKEN_REFRESH_MARGIN = 300
+TOKEN_REFRESH_RETRY = 60
+
+# Minimum number of seconds between YouTube API requests, to smooth out bursts
+API_MIN_INTERVAL = 0.2
+
+# Times a request failing with a 429, a 5xx or a connection error is retried, with
+# randomized exponential backoff, before the error is raised
+API_NUM_RETRIES = 3
+
+# The daily API quota resets at midnight Pacific Time. A fixed UTC-8 offset avoids
+# needing tz data and at worst waits an extra hour during daylight saving time
+QUOTA_RESET_TIMEZONE = timezone(timedelta(hours=-8))
+
+# SQLite file persisting search results across restarts
+SEARCH_CACHE_PATH = Path("data") / "search_cache.sqlite3"
+
+# Partial response of search.list: just the video ID and title of each result
+SEARCH_FIELDS = "items(id/videoId,snippet/title)"
+YOUTUBE_WATCH_URL = "https://www.youtube.com/watch?v="
+
+# YouTube API client and the credentials it was built with
 youtube = None
+credentials = None
+
+# The API client's httplib2 transport is not thread-safe, so requests run one at a
+# time on their own thread instead of blocking the event loop
+api_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="youtube-api")
+atexit.register(api_executor.shutdown, wait=False)
+
+# When the last API request was sent, on the time.monotonic() clock
+last_api_request = 0.0
+
+# Until when searches skip the API because the daily quota is used up, on the
+# time.monotonic() clock
+quota_exhausted_until = 0.0
+
+# Background task refreshing the credentials before they expire
+token_refresh_task: asyncio.Task | None = None
+
+# Search results keyed by (normalized query, max_results)
+search_cache: TTLCache = TTLCache(maxsize=SEARCH_CACHE_SIZE, ttl=SEARCH_CACHE_TTL)
+empty_search_cache: TTLCache = TTLCache(maxsize=SEARCH_CACHE_SIZE, ttl=EMPTY_SEARCH_CACHE_TTL)
+
+# Search results persisted across restarts, keyed by max_results and normalized query
+search_store = MetadataCache(SEARCH_CACHE_PATH, max_entries=SEARCH_CACHE_SIZE)
+
+# Searches currently running, keyed like search_cache, so identical concurrent
+# searches share one API call
+inflight_searches: dict[tuple, asyncio.Task] = {}
+
+
+class Video(NamedTuple):
+    """A single search result, kept as a tuple since thousands may be cached at once."""
+
+    id: str
+    title: str
+    from_account: bool = False  # Found by the API with the connected account
+
+    @property
+    def url(self):
+        """The watch page URL of the video."""
+        return YOUTUBE_WATCH_URL + self.id
+
+
+def authenticate_youtube(force=False):
+    """Authenticate with YouTube API and return the API client.
 
+    The existing client is reused while its credentials are valid, unless `force`
+    is set. Blocks on file and network I/O, so call it from a thread once the
+    event loop is running.
+    """
+    global youtube, credentials
+    if youtube is not None and credentials is not None and credentials.valid and not force:
+        return youtube
 
-def authenticate_youtube():
-    """Authenticate with YouTube API and return the API client."""
-    global youtube
-    creds = None
-    # The file token.pickle stores the user's access and refresh tokens
-    if os.path.exists(TOKEN_PICKLE_PATH):
-        with open(TOKEN_PICKLE_PATH, "rb") as token:
-            creds = pickle.load(token)
+    # The Google client libraries are slow to import and only needed once the user
+    # opts into API access, so keep them off the startup path.
+    from google.auth.transport.requests import Request
+    from google_auth_oauthlib.flow import InstalledAppFlow
+    from googleapiclient.discovery import build
+
+    # The token file stores the user's access and refresh tokens
+    creds = load_credentials()
 
     # If there are no (valid) credentials available, let the user log in.
     if not creds or not creds.valid:
@@ -41,47 +131,278 @@ def authenticate_youtube():
             creds = flow.run_local_server(port=0)
 
         # Save the credentials for the next run
-        with open(TOKEN_PICKLE_PATH, "wb") as token:
-            pickle.dump(creds, token)
+        save_credentials(creds)
 
-    # Build the YouTube API service
-    youtube = build("youtube", "v3", credentials=creds)
+    # Build the YouTube API service from the discovery document bundled with the
+    # client library, so no discovery request or file cache is needed.
+    youtube = build(
+        "youtube", "v3", credentials=creds, static_discovery=True, cache_discovery=False
+    )
+    credentials = creds
     return youtube
 
 
+def load_credentials():
+    """Load the stored credentials, or return None if there are none.
+
+    Tokens are stored as authorized-user JSON in TOKEN_PATH. A token file left at
+    TOKEN_PICKLE_PATH by older versions is read once, saved to TOKEN_PATH and
+    removed.
+    """
+    from google.oauth2.credentials import Credentials
+
+    if os.path.exists(TOKEN_PATH):
+        with open(TOKEN_PATH) as token:
+            return Credentials.from_authorized_user_info(json.load(token), SCOPES)
+    if not os.path.exists(TOKEN_PICKLE_PATH):
+        return None
+
+    with open(TOKEN_PICKLE_PATH, "rb") as token:
+        data = token.read()
+    try:
+        # Recent versions already wrote JSON to the old path
+        creds = Credentials.from_authorized_user_info(json.loads(data), SCOPES)
+    except ValueError:
+        creds = pickle.loads(data)
+    logger.info(f"Moving the YouTube token from {TOKEN_PICKLE_PATH} to {TOKEN_PATH}")
+    save_credentials(creds)
+    os.remove(TOKEN_PICKLE_PATH)
+    return creds
+
+
+def save_credentials(creds):
+    """Store the credentials in the token file for the next run.
+
+    The file is replaced atomically so a crash mid-write cannot corrupt it.
+    """
+    temp_path = f"{TOKEN_PATH}.tmp"
+    with open(temp_path, "w") as token:
+        token.write(creds.to_json())
+    os.replace(temp_path, TOKEN_PATH)
+
+
+def execute_throttled(request):
+    """Execute an API request, waiting until API_MIN_INTERVAL has passed since the last one.
+
+    Must run on api_executor, whose single thread serializes the requests.
+    """
+    global last_api_request
+    wait = last_api_request + API_MIN_INTERVAL - time.monotonic()
+    if wait > 0:
+        time.sleep(wait)
+    last_api_request = time.monotonic()
+    return request.execute(num_retries=API_NUM_RETRIES)
+
+
+def is_quota_exceeded(error):
+    """Return whether an HttpError reports that the daily API quota is used up."""
+    details = error.error_details if isinstance(error.error_details, list) else ()
+    return error.resp.status == 403 and any(
+        isinstance(detail, dict) and detail.get("reason") == "quotaExceeded" for detail in details
+    )
+
+
+def seconds_until_quota_reset():
+    """Return the number of seconds until the next midnight Pacific Time."""
+    now = datetime.now(QUOTA_RESET_TIMEZONE)
+    midnight = now.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+    return (midnight - now).total_seconds()
+
+
+def start_token_refresh():
+    """Start refreshing the credentials in the background, if not already running.
+
+    Access tokens are refreshed shortly before they expire, so searches never
+    wait for a refresh round-trip.
+    """
+    global token_refresh_task
+    if token_refresh_task is None or token_refresh_task.done():
+        token_refresh_task = asyncio.create_task(_refresh_token_periodically())
+
+
+async def _refresh_token_periodically():
+    """Refresh the current credentials TOKEN_REFRESH_MARGIN seconds before they expire."""
+    from google.auth.transport.requests import Request
+
+    def refresh():
+        credentials.refresh(Request())
+        save_credentials(credentials)
+
+    loop = asyncio.get_running_loop()
+    while credentials is not None and credentials.refresh_token and credentials.expiry:
+        # google-auth stores expiry as a naive UTC datetime
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        delay = (credentials.expiry - now).total_seconds() - TOKEN_REFRESH_MARGIN
+        await asyncio.sleep(max(delay, 0))
+        try:
+            # Refresh on the API thread so it cannot race a request using the credentials
+            await loop.run_in_executor(api_executor, refresh)
+            logger.debug("Refreshed YouTube API access token")
+        except Exception as e:
+            logger.warning(f"Failed to refresh YouTube API access token: {str(e)}")
+            await asyncio.sleep(TOKEN_REFRESH_RETRY)
+
+
+async def warmup():
+    """Authenticate and open the API connection before the first search.
+
+    Token loading or refresh and the TLS handshake with the API host are done up
+    front, so the first search does not pay for them. The connection is primed with
+    a 1-unit i18nRegions request rather than a 100-unit search.
+
+    Raises:
+        Exception: If authentication fails.
+    """
+    client = await asyncio.to_thread(authenticate_youtube)
+    start_token_refresh()
+    try:
+        request = client.i18nRegions().list(part="id", fields="etag")
+        await asyncio.get_running_loop().run_in_executor(api_executor, execute_throttled, request)
+        logger.debug("YouTube API connection warmed up")
+    except Exception as e:
+        logger.debug(f"YouTube API warmup request failed: {str(e)}")
+
+
 async def search_youtube(query, max_results=1):
-    """Search YouTube using the authenticated API."""
+    """Search YouTube using the authenticated API.
+
+    Returns None when the API is not authenticated, the daily quota is used up or
+    the request fails, so the caller can fall back to yt-dlp search. Transient
+    failures are retried by execute_throttled first.
+    """
+    global quota_exhausted_until
     if not youtube:
         # If YouTube API authentication failed, return None
-        logger.warning("YouTube API not authenticated, cannot search")
+        logger.debug("YouTube API not authenticated, cannot search")
         return None
+    if time.monotonic() < quota_exhausted_until:
+        logger.debug("YouTube API quota exceeded, skipping API search")
+        return None
+
+    # Only imported once a client exists, so the Google libraries are already loaded
+    import httplib2
+    from googleapiclient.errors import HttpError
 
     try:
         # Call the search.list method to retrieve results matching the specified query term
         logger.debug(f"Searching YouTube for: {query} (max_results={max_results})")
-        search_response = (
-            youtube.search()
-            .list(q=query, part="id,snippet", maxResults=max_results, type="video")
-            .execute()
+        # Only request the fields that are used below; type="video" guarantees every
+        # item is a video
+        request = youtube.search().list(
+            q=query,
+            part="id,snippet",
+            maxResults=max_results,
+            type="video",
+            fields=SEARCH_FIELDS,
         )
+        loop = asyncio.get_running_loop()
+        search_response = await loop.run_in_executor(api_executor, execute_throttled, request)
 
-        videos = []
-        for search_result in search_response.get("items", []):
-            if search_result["id"]["kind"] == "youtube#video":
-                video_id = search_result["id"]["videoId"]
-                title = search_result["snippet"]["title"]
-                url = f"https://www.youtube.com/watch?v={video_id}"
-                logger.debug(f"Found video: {title} ({url})")
-                videos.append(
-                    {
-                        "id": video_id,
-                        "title": title,
-                        "url": url,
-                    }
-                )
+        videos = [
+            Video(item["id"]["videoId"], item["snippet"]["title"], from_account=True)
+            for item in search_response.get("items", ())
+        ]
 
         logger.info(f"Found {len(videos)} videos matching query: {query}")
+        logger.debug("Search results: {}", videos)
         return videos
-    except Exception as e:
-        logger.error(f"Error searching YouTube API: {str(e)}")
+    except HttpError as e:
+        if is_quota_exceeded(e):
+            delay = seconds_until_quota_reset()
+            quota_exhausted_until = time.monotonic() + delay
+            logger.warning(
+                f"YouTube API quota exceeded, using yt-dlp search for the next {delay / 3600:.1f} hours"
+            )
+            return None
+        logger.error(f"YouTube API search failed with HTTP {e.resp.status}: {str(e)}")
+        return None
+    except (OSError, httplib2.HttpLib2Error) as e:
+        logger.error(f"Could not reach the YouTube API: {str(e)}")
         return None
+
+
+async def clear_search_caches():
+    """Drop all cached search results, in memory and on disk.
+
+    Returns the number of persisted searches removed.
+    """
+    search_cache.clear()
+    empty_search_cache.clear()
+    return await asyncio.to_thread(search_store.clear)
+
+
+async def search_ytdlp(query, max_results=1):
+    """Search YouTube anonymously with yt-dlp, which uses no API quota.
+
+    Returns None if the search fails.
+    """
+    # Imported here so loading this module does not pull in yt-dlp
+    from src.player.ytdl_source import search_videos
+
+    entries = await search_videos(query, max_results)
+    if entries is None:
+        logger.error(f"yt-dlp search failed for: {query}")
+        return None
+    videos = [Video(entry["id"], entry.get("title") or entry["id"]) for entry in entries]
+    logger.info(f"Found {len(videos)} videos with yt-dlp matching query: {query}")
+    return videos
+
+
+def normalize_query(query):
+    """Normalize a search query so equivalent queries share a cache entry."""
+    return " ".join(query.lower().split())
+
+
+async def search_youtube_cached(query, max_results=1):
+    """Search YouTube, reusing results for recent and in-flight identical queries.
+
+    Failed searches (None) are never cached so they are retried on the next call.
+    """
+    key = (normalize_query(query), max_results)
+    videos = search_cache.get(key)
+    if videos is not None:
+        logger.debug(f"Search cache hit for: {query}")
+        return videos
+    if key in empty_search_cache:
+        logger.debug(f"Empty search cache hit for: {query}")
+        return []
+
+    task = inflight_searches.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_search_and_cache(query, key, max_results))
+        inflight_searches[key] = task
+        task.add_done_callback(lambda _: inflight_searches.pop(key, None))
+    else:
+        logger.debug(f"Joining in-flight search for: {query}")
+    # Shield the shared search so one cancelled caller does not cancel it for the others
+    return await asyncio.shield(task)
+
+
+async def _search_and_cache(query, key, max_results):
+    """Run a search and store its result in the matching caches.
+
+    Results persisted by an earlier run are used before asking the API, but only
+    while a client is connected, since they came from the connected account. When
+    the API cannot be used (no client, quota used up or a failed request), yt-dlp
+    searches instead; its results are only cached in memory.
+    """
+    store_key = f"{max_results}:{key[0]}"
+    stored = None
+    if youtube is not None:
+        stored = await asyncio.to_thread(search_store.get, store_key)
+    if stored is not None:
+        logger.debug(f"Persistent search cache hit for: {query}")
+        videos = [Video(*video) for video in stored["videos"]]
+    else:
+        videos = await search_youtube(query, max_results)
+        if videos is not None:
+            ttl = SEARCH_CACHE_TTL if videos else EMPTY_SEARCH_CACHE_TTL
+            await asyncio.to_thread(search_store.put, store_key, {"videos": videos}, ttl)
+        else:
+            videos = await search_ytdlp(query, max_results)
+
+    if videos:
+        search_cache[key] = videos
+    elif videos is not None:
+        empty_search_cache[key] = videos
+    return videos